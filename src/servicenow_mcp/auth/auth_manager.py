@@ -36,6 +36,14 @@ class AuthManager:
         self.instance_url = instance_url
         self.token: Optional[str] = None
         self.token_type: Optional[str] = None
+        
+        # The config is immutable, so the Basic credentials can be encoded once
+        # instead of on every request
+        self._basic_auth_header: Optional[str] = None
+        if config.type == AuthType.BASIC and config.basic:
+            auth_str = f"{config.basic.username}:{config.basic.password}"
+            encoded = base64.b64encode(auth_str.encode()).decode()
+            self._basic_auth_header = f"Basic {encoded}"
     
     def get_headers(self) -> Dict[str, str]:
         """
@@ -50,12 +58,10 @@ class AuthManager:
         }
         
         if self.config.type == AuthType.BASIC:
-            if not self.config.basic:
+            if not self._basic_auth_header:
                 raise ValueError("Basic auth configuration is required")
             
-            auth_str = f"{self.config.basic.username}:{self.config.basic.password}"
-            encoded = base64.b64encode(auth_str.encode()).decode()
-            headers["Authorization"] = f"Basic {encoded}"
+            headers["Authorization"] = self._basic_auth_header
         
         elif self.config.type == AuthType.OAUTH:
             if not self.token:
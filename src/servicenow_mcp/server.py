@@ -9,6 +9,7 @@ import logging
 import os
 from typing import Any, Dict, List, Union
 
+import anyio
 import mcp.types as types
 import yaml
 from mcp.server.lowlevel import Server
@@ -272,9 +273,13 @@ class ServiceNowMCP:
             )
             raise ValueError(f"Failed to parse arguments for tool '{name}': {e}")
 
-        # Execute the tool implementation function
+        # Execute the tool implementation function. Tools make blocking
+        # ServiceNow API calls, so run them in a worker thread to keep the
+        # event loop serving other requests and streams meanwhile.
         try:
-            result = impl_func(self.config, self.auth_manager, params)
+            result = await anyio.to_thread.run_sync(
+                impl_func, self.config, self.auth_manager, params
+            )
             logger.debug(f"Raw result type from tool '{name}': {type(result)}")
         except Exception as e:
             logger.error(f"Error executing tool '{name}': {e}", exc_info=True)
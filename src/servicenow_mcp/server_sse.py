@@ -4,67 +4,340 @@ MODIFIED: Supports both SSE mode and stateless HTTP mode for ServiceNow compatib
 """
 
 import argparse
+import asyncio
+import atexit
 import hashlib
-import json
+import hmac
+import importlib.util
 import logging
 import os
-from typing import Dict
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from urllib.parse import parse_qsl
 
+import orjson
 import uvicorn
 from dotenv import load_dotenv
 from mcp.server.sse import SseServerTransport
 from starlette.applications import Starlette
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
-from starlette.routing import Route
 from starlette.middleware import Middleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import Response
+from starlette.routing import Route, Router
 
 from servicenow_mcp.server import ServiceNowMCP
 from servicenow_mcp.utils.config import AuthConfig, AuthType, BasicAuthConfig, ServerConfig
 
+
+def _configure_logging() -> None:
+    """
+    Route log records through a queue so request handlers only enqueue them.
+    
+    Formatting and writing to stderr happen on a QueueListener thread rather
+    than on the event loop.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    
+    # force=True replaces the handler servicenow_mcp.server installs on import;
+    # the queue handler only renders the message, the listener adds the rest
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=True)
+    
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+_configure_logging()
 logger = logging.getLogger(__name__)
 
 
-# Global storage for stateless sessions
+# Prefer the C-accelerated event loop and HTTP parser; fall back to uvicorn's
+# pure-Python stack where they are unavailable (e.g. uvloop on Windows)
+UVICORN_LOOP = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+UVICORN_HTTP = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+# Extra headers for SSE responses so reverse proxies (nginx, ingress
+# controllers, CDNs) stream events through instead of buffering or compressing
+SSE_RESPONSE_HEADERS = [
+    (b"cache-control", b"no-cache, no-transform"),
+    (b"x-accel-buffering", b"no"),
+    (b"connection", b"keep-alive"),
+    (b"content-encoding", b"identity"),
+]
+_SSE_HEADER_NAMES = frozenset(name for name, _ in SSE_RESPONSE_HEADERS)
+
+
+# Environment variables required to connect to ServiceNow, in the order
+# _load_env returns them
+REQUIRED_ENV_VARS = ("SERVICENOW_INSTANCE_URL", "SERVICENOW_USERNAME", "SERVICENOW_PASSWORD")
+
+
+# Maximum number of messages accepted in one stateless JSON-RPC batch
+STATELESS_BATCH_LIMIT = 100
+
+
+# Global storage for stateless sessions, keyed by a hash of the API key.
+# Stateless mode requires an API key and APIKeyMiddleware only admits the one
+# configured in MCP_API_KEY, so this holds at most one entry per process.
 stateless_sessions: Dict[str, dict] = {}
 
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    """Middleware to validate API key for protected endpoints."""
+class ORJSONResponse(Response):
+    """JSON response rendered with orjson, which produces UTF-8 bytes directly."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+# Pre-serialized JSON-RPC error objects for the fixed error messages
+_ERR_API_KEY_REQUIRED = orjson.dumps(
+    {"code": -32001, "message": "API key required for stateless mode"}
+)
+_ERR_NOT_INITIALIZED = orjson.dumps({"code": -32002, "message": "Session not initialized"})
+_ERR_INVALID_REQUEST = orjson.dumps({"code": -32600, "message": "Invalid Request"})
+_ERR_INVALID_BATCH = orjson.dumps({
+    "code": -32600,
+    "message": f"Invalid Request: batches must hold 1 to {STATELESS_BATCH_LIMIT} messages",
+})
+
+
+def _session_key(api_key: str) -> str:
+    """Derive the stateless session identifier for an API key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _result_response(result: bytes, request_id) -> Response:
+    """Build a JSON-RPC success response around a pre-serialized result."""
+    return Response(
+        b'{"jsonrpc":"2.0","id":' + orjson.dumps(request_id) + b',"result":' + result + b"}",
+        media_type="application/json",
+    )
+
+
+def _error_response(error: bytes, request_id, status_code: int) -> Response:
+    """Build a JSON-RPC error response around a pre-serialized error object."""
+    return Response(
+        b'{"jsonrpc":"2.0","error":' + error + b',"id":' + orjson.dumps(request_id) + b"}",
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+# Pre-built ASGI messages for rejected API keys
+_UNAUTHORIZED_CONTENT = orjson.dumps(
+    {"error": "Unauthorized", "message": "Invalid or missing API key"}
+)
+_UNAUTHORIZED_START = {
+    "type": "http.response.start",
+    "status": 401,
+    "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(_UNAUTHORIZED_CONTENT)).encode()),
+    ],
+}
+_UNAUTHORIZED_BODY = {"type": "http.response.body", "body": _UNAUTHORIZED_CONTENT}
+
+
+async def _read_body(receive):
+    """
+    Read a complete ASGI request body.
     
-    async def dispatch(self, request: Request, call_next):
-        # Skip auth for health check
-        if request.url.path == "/health" or request.url.path == "/":
-            return await call_next(request)
-        
-        # Get API key from environment
-        expected_api_key = os.getenv("MCP_API_KEY")
-        
-        # If no API key is configured, allow all requests (backward compatible)
-        if not expected_api_key:
-            logger.warning("MCP_API_KEY not set - running without authentication!")
-            return await call_next(request)
-        
-        # Check API key in header
-        provided_api_key = request.headers.get("X-API-Key") or request.headers.get("Authorization", "").replace("Bearer ", "")
-        
-        if provided_api_key != expected_api_key:
-            logger.warning(f"Invalid API key attempt from {request.client}")
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Unauthorized", "message": "Invalid or missing API key"}
+    Single-chunk bodies (the common case) are returned as received; larger
+    ones are accumulated in one growable bytearray rather than a list of
+    chunks joined at the end.
+    """
+    message = await receive()
+    if message["type"] == "http.disconnect":
+        raise ClientDisconnect()
+    body = message.get("body", b"")
+    if not message.get("more_body", False):
+        return body
+    
+    buffer = bytearray(body)
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnect()
+        buffer += message.get("body", b"")
+        if not message.get("more_body", False):
+            return buffer
+
+
+def _with_sse_headers(send):
+    """Wrap an ASGI send callable so the response start carries SSE_RESPONSE_HEADERS."""
+    async def send_with_headers(message):
+        if message["type"] == "http.response.start":
+            headers = [
+                (name, value)
+                for name, value in message.get("headers", ())
+                if name.lower() not in _SSE_HEADER_NAMES
+            ]
+            headers.extend(SSE_RESPONSE_HEADERS)
+            message = {**message, "headers": headers}
+        await send(message)
+    
+    return send_with_headers
+
+
+class ASGIEndpoint:
+    """
+    Adapter that registers a plain ``(scope, receive, send)`` coroutine as a
+    Route endpoint.
+    
+    Starlette wraps function endpoints so they receive a Request and must
+    return a Response; wrapping the coroutine in an object makes Route treat
+    it as an ASGI app instead, so no Request is built for it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+class StaticRouter(Router):
+    """
+    Router for a fixed table of exact-path routes.
+
+    Resolves ``(path, method)`` with a single dict lookup instead of matching
+    every route's path pattern in turn. Anything not in the table (mounts,
+    lifespan events, 404 and 405 responses) falls through to ``Router``.
+    """
+
+    def __init__(self, routes):
+        super().__init__(routes=routes)
+        self._table = {
+            (route.path, method): route.app
+            for route in routes
+            if isinstance(route, Route)
+            for method in route.methods or ()
+        }
+
+    async def app(self, scope, receive, send):
+        if scope["type"] == "http":
+            endpoint = self._table.get((scope["path"], scope["method"]))
+            if endpoint is not None:
+                scope.setdefault("router", self)
+                await endpoint(scope, receive, send)
+                return
+        await super().app(scope, receive, send)
+
+
+class StaticResponseMiddleware:
+    """
+    Pure ASGI middleware that answers GET requests for fixed JSON payloads.
+
+    Used for the / and /health probes, whose bodies never change: the response
+    messages are built once and sent before routing, exception handling or
+    any endpoint runs. Every other request passes through unchanged.
+    """
+
+    def __init__(self, app, responses: Dict[str, bytes]):
+        self.app = app
+        self._responses = {
+            path: (
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                    ],
+                },
+                {"type": "http.response.body", "body": body},
             )
+            for path, body in responses.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            messages = self._responses.get(scope["path"])
+            if messages is not None:
+                await send(messages[0])
+                await send(messages[1])
+                return
+        await self.app(scope, receive, send)
+
+
+class APIKeyMiddleware:
+    """
+    Pure ASGI middleware to validate API key for protected endpoints.
+
+    Wraps the /sse and /messages endpoints directly, and only when MCP_API_KEY
+    is configured; the public / and /health routes never pass through it.
+    """
+
+    def __init__(self, app, expected_key: str):
+        self.app = app
+        # Keep the expected key as bytes; it is compared in constant time
+        self._expected = expected_key.encode()
+        # Only the expected key is ever admitted, so its stateless session
+        # key can be derived once up front
+        self._session_key = _session_key(expected_key)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Check API key in header, scanning the raw ASGI headers (lowercased
+        # names, bytes values) rather than building a Headers mapping
+        provided_api_key = b""
+        for name, value in scope["headers"]:
+            if name == b"x-api-key" and value:
+                provided_api_key = value
+                break
+            if name == b"authorization" and not provided_api_key:
+                provided_api_key = value[7:] if value.startswith(b"Bearer ") else value
+
+        if not hmac.compare_digest(provided_api_key, self._expected):
+            logger.warning("Invalid API key attempt from %s", scope.get("client"))
+            await send(_UNAUTHORIZED_START)
+            await send(_UNAUTHORIZED_BODY)
+            return
+
+        # Get or create the stateless session for this key
+        session = stateless_sessions.get(self._session_key)
+        if session is None:
+            session = stateless_sessions.setdefault(
+                self._session_key, {"initialized": False, "capabilities": {}}
+            )
+            logger.info("Created new stateless session: %s", self._session_key)
         
-        # Store validated API key in request state for stateless mode
-        request.state.api_key = provided_api_key
-        
-        return await call_next(request)
+        # Store validated API key and its session in request state for stateless mode
+        state = scope.setdefault("state", {})
+        state["api_key"] = provided_api_key.decode("latin-1")
+        state["session_key"] = self._session_key
+        state["session"] = session
+
+        await self.app(scope, receive, send)
+
+
+def _create_app(routes, debug=False, static_responses=None) -> Starlette:
+    """
+    Create a Starlette app whose routes are resolved by a StaticRouter.
+    
+    ``static_responses`` maps paths to fixed JSON bodies that are served to
+    GET requests by StaticResponseMiddleware before the router is reached.
+    """
+    middleware = []
+    if static_responses:
+        middleware.append(Middleware(StaticResponseMiddleware, responses=static_responses))
+    app = Starlette(debug=debug, middleware=middleware)
+    app.router = StaticRouter(routes)
+    return app
 
 
 def create_sse_server_app(mcp_server, servicenow_mcp_instance) -> Starlette:
@@ -81,16 +354,55 @@ def create_sse_server_app(mcp_server, servicenow_mcp_instance) -> Starlette:
     # Create SSE transport with /messages path
     sse_transport = SseServerTransport("/messages")
     
-    async def sse_handler(request: Request):
-        """Handle SSE connection endpoint."""
-        logger.info(f"SSE connection request from {request.client}")
+    # The enabled tools are fixed once ServiceNowMCP is built, so the
+    # serialized tools/list result is computed on first use and then reused
+    tools_result: Optional[bytes] = None
+    
+    # Initialization options only depend on the registered handlers, which are
+    # fixed by now, so build them once rather than on every SSE connection
+    init_options = mcp_server.create_initialization_options()
+    
+    # Resolve the tool entry point once instead of on every tools/call
+    call_tool = servicenow_mcp_instance._call_tool_impl
+    
+    # The / and /health payloads never change for the lifetime of the app,
+    # so serialize them once instead of on every request
+    expected_key = os.getenv("MCP_API_KEY")
+    auth_enabled = bool(expected_key)
+    health_body = orjson.dumps({
+        "status": "healthy",
+        "service": "servicenow-mcp-sse",
+        "version": "0.1.0",
+        "modes": ["sse", "stateless"],
+        "authentication": "enabled" if auth_enabled else "disabled"
+    })
+    root_body = orjson.dumps({
+        "service": "ServiceNow MCP Server",
+        "transport": "SSE + Stateless HTTP",
+        "version": "0.1.0",
+        "endpoints": {
+            "sse": "/sse (for persistent SSE connections)",
+            "messages": "/messages (supports both SSE with ?session_id=xxx and stateless mode)",
+            "health": "/health"
+        },
+        "modes": {
+            "sse": "POST /sse to establish connection, then POST /messages?session_id=xxx",
+            "stateless": "POST /messages directly with X-API-Key header (ServiceNow compatible)"
+        },
+        "authentication": "API Key required" if auth_enabled else "None"
+    })
+    
+    async def sse_handler(scope, receive, send):
+        """Handle SSE connection endpoint (raw ASGI)."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("SSE connection request from %s", scope.get("client"))
         
         try:
             # Connect SSE and get streams
             async with sse_transport.connect_sse(
-                request.scope,
-                request.receive,
-                request._send,
+                scope,
+                receive,
+                _with_sse_headers(send),
             ) as streams:
                 logger.info("SSE streams established, running MCP server")
                 
@@ -98,137 +410,87 @@ def create_sse_server_app(mcp_server, servicenow_mcp_instance) -> Starlette:
                 await mcp_server.run(
                     streams[0],  # read_stream
                     streams[1],  # write_stream
-                    mcp_server.create_initialization_options(),
+                    init_options,
                 )
                 
         except Exception as e:
-            logger.error(f"Error in SSE handler: {e}", exc_info=True)
+            logger.error("Error in SSE handler: %s", e, exc_info=True)
             raise
     
-    async def messages_handler(request: Request):
+    async def messages_handler(scope, receive, send):
         """
-        Handle POST requests to /messages endpoint.
+        Handle POST requests to /messages endpoint (raw ASGI).
         Supports both:
         1. SSE mode: session_id in query params (original behavior)
         2. Stateless mode: no session_id, uses API key for session management
         """
-        logger.info(f"POST message from {request.client}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("POST message from %s", scope.get("client"))
         
         # Check if this is SSE mode (has session_id) or stateless mode
-        session_id = request.query_params.get("session_id")
+        query_string = scope["query_string"]
+        session_id = (
+            dict(parse_qsl(query_string.decode("latin-1"))).get("session_id")
+            if query_string
+            else None
+        )
         
         if session_id:
             # SSE mode - use the original SSE transport handler
-            logger.info(f"SSE mode: session_id={session_id}")
-            return await sse_transport.handle_post_message(
-                request.scope,
-                request.receive,
-                request._send
-            )
+            logger.info("SSE mode: session_id=%s", session_id)
+            await sse_transport.handle_post_message(scope, receive, send)
         else:
             # Stateless mode - handle directly
             logger.info("Stateless mode: handling direct MCP request")
-            return await handle_stateless_request(request, servicenow_mcp_instance)
+            response = await handle_stateless_request(scope, receive)
+            await response(scope, receive, send)
     
-    async def handle_stateless_request(request: Request, mcp_instance):
-        """
-        Handle stateless MCP requests (ServiceNow compatibility mode).
-        Creates a virtual session based on API key.
-        """
-        try:
-            # Get API key from request state (set by middleware)
-            api_key = getattr(request.state, 'api_key', None)
-            if not api_key:
-                return JSONResponse(
-                    status_code=401,
-                    content={
-                        "jsonrpc": "2.0",
-                        "error": {"code": -32001, "message": "API key required for stateless mode"},
-                        "id": None
-                    }
-                )
-            
-            # Create a deterministic session identifier from API key
-            session_key = hashlib.sha256(api_key.encode()).hexdigest()[:16]
-            
-            # Parse the JSON-RPC request
-            body = await request.body()
-            try:
-                rpc_request = json.loads(body)
-            except json.JSONDecodeError as e:
-                return JSONResponse(
-                    status_code=400,
-                    content={
-                        "jsonrpc": "2.0",
-                        "error": {"code": -32700, "message": f"Parse error: {e}"},
-                        "id": None
-                    }
-                )
-            
-            method = rpc_request.get("method")
-            params = rpc_request.get("params", {})
-            request_id = rpc_request.get("id")
-            
-            logger.info(f"Stateless request: method={method}, session={session_key}")
-            
-            # Initialize session if needed
-            if session_key not in stateless_sessions:
-                stateless_sessions[session_key] = {
-                    "initialized": False,
-                    "capabilities": {}
-                }
-                logger.info(f"Created new stateless session: {session_key}")
-            
-            session = stateless_sessions[session_key]
-            
-            # Handle different MCP methods
-            if method == "initialize":
-                logger.info("Handling initialize request")
-                session["initialized"] = True
-                session["capabilities"] = params.get("capabilities", {})
-                
-                # Use the client's requested protocol version for compatibility
-                client_version = params.get("protocolVersion", "2024-11-05")
-                
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "protocolVersion": client_version,  # Echo back client's version
-                        "capabilities": {
-                            "tools": {}  # Server supports tools
-                        },
-                        "serverInfo": {
-                            "name": "ServiceNow MCP Server",
-                            "version": "0.1.0"
-                        }
-                    }
+    async def handle_initialize(params, session, request_id):
+        """Handle the initialize request."""
+        logger.info("Handling initialize request")
+        session["initialized"] = True
+        session["capabilities"] = params.get("capabilities", {})
+        
+        # Use the client's requested protocol version for compatibility
+        client_version = params.get("protocolVersion", "2024-11-05")
+        
+        response = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {
+                "protocolVersion": client_version,  # Echo back client's version
+                "capabilities": {
+                    "tools": {}  # Server supports tools
+                },
+                "serverInfo": {
+                    "name": "ServiceNow MCP Server",
+                    "version": "0.1.0"
                 }
-                return JSONResponse(response)
-            
-            elif method == "notifications/initialized":
-                logger.info("Handling initialized notification")
-                # No response needed for notifications
-                return Response(status_code=200)
+            }
+        }
+        return ORJSONResponse(response)
+    
+    async def handle_initialized(params, session, request_id):
+        """Handle the initialized notification."""
+        logger.info("Handling initialized notification")
+        # No response needed for notifications
+        return Response(status_code=202)
+    
+    async def handle_tools_list(params, session, request_id):
+        """Handle the tools/list request from the cached, serialized catalog."""
+        nonlocal tools_result
+        logger.info("Handling tools/list request")
+        
+        if not session.get("initialized"):
+            return _error_response(_ERR_NOT_INITIALIZED, request_id, 400)
+        
+        if tools_result is None:
+            # Get tools from the MCP instance
+            tools_list = await servicenow_mcp_instance._list_tools_impl()
             
-            elif method == "tools/list":
-                logger.info("Handling tools/list request")
-                
-                if not session.get("initialized"):
-                    return JSONResponse(
-                        status_code=400,
-                        content={
-                            "jsonrpc": "2.0",
-                            "error": {"code": -32002, "message": "Session not initialized"},
-                            "id": request_id
-                        }
-                    )
-                
-                # Get tools from the MCP instance
-                tools_list = await mcp_instance._list_tools_impl()
-                
-                # Convert to JSON-RPC response format
-                tools_json = [
+            # Convert to JSON-RPC result format
+            tools_result = orjson.dumps({
+                "tools": [
                     {
                         "name": tool.name,
                         "description": tool.description,
@@ -236,137 +498,203 @@ def create_sse_server_app(mcp_server, servicenow_mcp_instance) -> Starlette:
                     }
                     for tool in tools_list
                 ]
-                
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "tools": tools_json
-                    }
-                }
-                
-                logger.info(f"Returning {len(tools_json)} tools")
-                return JSONResponse(response)
+            })
+            logger.info("Cached tools/list result with %d tools", len(tools_list))
+        
+        return _result_response(tools_result, request_id)
+    
+    async def handle_tools_call(params, session, request_id):
+        """Handle the tools/call request."""
+        logger.info("Handling tools/call request")
+        
+        if not session.get("initialized"):
+            return _error_response(_ERR_NOT_INITIALIZED, request_id, 400)
+        
+        tool_name = params.get("name")
+        tool_arguments = params.get("arguments", {})
+        
+        logger.info("Calling tool: %s", tool_name)
+        
+        try:
+            # Call the tool
+            result = await call_tool(tool_name, tool_arguments)
             
-            elif method == "tools/call":
-                logger.info("Handling tools/call request")
-                
-                if not session.get("initialized"):
-                    return JSONResponse(
-                        status_code=400,
-                        content={
-                            "jsonrpc": "2.0",
-                            "error": {"code": -32002, "message": "Session not initialized"},
-                            "id": request_id
-                        }
-                    )
-                
-                tool_name = params.get("name")
-                tool_arguments = params.get("arguments", {})
-                
-                logger.info(f"Calling tool: {tool_name}")
-                
-                try:
-                    # Call the tool
-                    result = await mcp_instance._call_tool_impl(tool_name, tool_arguments)
-                    
-                    # Convert result to JSON-RPC response
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": result[0].text
-                                }
-                            ]
-                        }
-                    }
-                    
-                    return JSONResponse(response)
-                    
-                except Exception as e:
-                    logger.error(f"Error calling tool {tool_name}: {e}", exc_info=True)
-                    return JSONResponse(
-                        status_code=500,
-                        content={
-                            "jsonrpc": "2.0",
-                            "error": {
-                                "code": -32603,
-                                "message": f"Tool execution error: {str(e)}"
-                            },
-                            "id": request_id
-                        }
-                    )
+            # Convert result to JSON-RPC response
+            return _result_response(
+                orjson.dumps({"content": [{"type": "text", "text": result[0].text}]}),
+                request_id,
+            )
             
-            else:
-                logger.warning(f"Unknown method: {method}")
-                return JSONResponse(
-                    status_code=400,
-                    content={
-                        "jsonrpc": "2.0",
-                        "error": {"code": -32601, "message": f"Method not found: {method}"},
-                        "id": request_id
-                    }
+        except Exception as e:
+            logger.error("Error calling tool %s: %s", tool_name, e, exc_info=True)
+            return _error_response(
+                orjson.dumps({"code": -32603, "message": f"Tool execution error: {e}"}),
+                request_id,
+                500,
+            )
+    
+    # Stateless MCP methods, resolved with a single dict lookup per message
+    method_handlers = {
+        "initialize": handle_initialize,
+        "notifications/initialized": handle_initialized,
+        "tools/list": handle_tools_list,
+        "tools/call": handle_tools_call,
+    }
+    
+    async def dispatch_one(rpc_request, session_key, session):
+        """
+        Dispatch a single JSON-RPC message against a stateless session.
+        
+        Always returns a Response. Messages without a string method are
+        invalid requests; notifications (valid messages without an id) get an
+        empty 202 Accepted and never an error, per JSON-RPC 2.0.
+        """
+        if not isinstance(rpc_request, dict) or not isinstance(rpc_request.get("method"), str):
+            return _error_response(_ERR_INVALID_REQUEST, None, 400)
+        
+        request_id = rpc_request.get("id")
+        # orjson decodes integers beyond 64 bits as floats, which could not be
+        # echoed back unchanged; JSON-RPC ids are strings, integers or null
+        if not isinstance(request_id, (str, int, type(None))) or isinstance(request_id, bool):
+            return _error_response(_ERR_INVALID_REQUEST, None, 400)
+        is_notification = "id" not in rpc_request
+        
+        try:
+            method = rpc_request["method"]
+            params = rpc_request.get("params", {})
+            
+            logger.info("Stateless request: method=%s, session=%s", method, session_key)
+            
+            handler = method_handlers.get(method)
+            if handler is None:
+                if is_notification:
+                    logger.info("Ignoring unknown notification: %s", method)
+                    return Response(status_code=202)
+                logger.warning("Unknown method: %s", method)
+                return _error_response(
+                    orjson.dumps({"code": -32601, "message": f"Method not found: {method}"}),
+                    request_id,
+                    400,
                 )
+            
+            response = await handler(params, session, request_id)
+            if is_notification:
+                return Response(status_code=202)
+            return response
         
         except Exception as e:
-            logger.error(f"Error in stateless handler: {e}", exc_info=True)
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "jsonrpc": "2.0",
-                    "error": {"code": -32603, "message": f"Internal error: {str(e)}"},
-                    "id": None
-                }
+            logger.error("Error in stateless handler: %s", e, exc_info=True)
+            if is_notification:
+                return Response(status_code=202)
+            return _error_response(
+                orjson.dumps({"code": -32603, "message": f"Internal error: {e}"}), request_id, 500
+            )
+    
+    async def dispatch_batch(rpc_requests, session_key, session):
+        """
+        Dispatch a JSON-RPC batch, running its messages concurrently.
+        
+        Responses are returned as a JSON array in request order; notifications
+        contribute nothing, and a batch of only notifications gets 202.
+        """
+        if not rpc_requests or len(rpc_requests) > STATELESS_BATCH_LIMIT:
+            return _error_response(_ERR_INVALID_BATCH, None, 400)
+        
+        responses = await asyncio.gather(
+            *(dispatch_one(rpc, session_key, session) for rpc in rpc_requests)
+        )
+        
+        bodies = [response.body for response in responses if response.body]
+        if not bodies:
+            return Response(status_code=202)
+        
+        return Response(b"[" + b",".join(bodies) + b"]", media_type="application/json")
+    
+    async def handle_stateless_request(scope, receive):
+        """
+        Handle stateless MCP requests (ServiceNow compatibility mode).
+        Creates a virtual session based on API key. The body may hold a
+        single JSON-RPC message or a batch (array) of them.
+        """
+        try:
+            # Get the session for the validated API key from request state
+            # (set by middleware)
+            state = scope.get("state", {})
+            session = state.get("session")
+            if session is None:
+                return _error_response(_ERR_API_KEY_REQUIRED, None, 401)
+            
+            session_key = state["session_key"]
+            
+            # Parse the JSON-RPC request
+            body = await _read_body(receive)
+            try:
+                rpc_request = orjson.loads(body)
+            except orjson.JSONDecodeError as e:
+                return _error_response(
+                    orjson.dumps({"code": -32700, "message": f"Parse error: {e}"}), None, 400
+                )
+            
+            if isinstance(rpc_request, list):
+                return await dispatch_batch(rpc_request, session_key, session)
+            
+            return await dispatch_one(rpc_request, session_key, session)
+        
+        except Exception as e:
+            logger.error("Error in stateless handler: %s", e, exc_info=True)
+            return _error_response(
+                orjson.dumps({"code": -32603, "message": f"Internal error: {e}"}), None, 500
             )
     
     async def health_handler(request: Request):
         """Health check endpoint."""
-        return JSONResponse({
-            "status": "healthy",
-            "service": "servicenow-mcp-sse",
-            "version": "0.1.0",
-            "modes": ["sse", "stateless"],
-            "authentication": "enabled" if os.getenv("MCP_API_KEY") else "disabled"
-        })
+        return Response(health_body, media_type="application/json")
     
     async def root_handler(request: Request):
         """Root endpoint with service information."""
-        return JSONResponse({
-            "service": "ServiceNow MCP Server",
-            "transport": "SSE + Stateless HTTP",
-            "version": "0.1.0",
-            "endpoints": {
-                "sse": "/sse (for persistent SSE connections)",
-                "messages": "/messages (supports both SSE with ?session_id=xxx and stateless mode)",
-                "health": "/health"
-            },
-            "modes": {
-                "sse": "POST /sse to establish connection, then POST /messages?session_id=xxx",
-                "stateless": "POST /messages directly with X-API-Key header (ServiceNow compatible)"
-            },
-            "authentication": "API Key required" if os.getenv("MCP_API_KEY") else "None"
-        })
-    
-    # Create Starlette app with routes and middleware
-    app = Starlette(
-        debug=True,
+        return Response(root_body, media_type="application/json")
+    
+    # Debug mode renders full tracebacks for every error, including routine
+    # SSE client disconnects; handlers already log errors with exc_info
+    debug = os.getenv("MCP_DEBUG", "0") == "1"
+    
+    # GET / and GET /health are answered by StaticResponseMiddleware ahead of
+    # routing; their routes stay registered for HEAD and 405 handling.
+    # Only /sse and /messages sit behind the API key middleware, which wraps
+    # those endpoints directly; / and /health never pass through it. Without
+    # a configured key the endpoints are served unauthenticated.
+    def protect(endpoint):
+        if auth_enabled:
+            return APIKeyMiddleware(endpoint, expected_key=expected_key)
+        return ASGIEndpoint(endpoint)
+    
+    app = _create_app(
         routes=[
             Route("/", endpoint=root_handler, methods=["GET"]),
             Route("/health", endpoint=health_handler, methods=["GET"]),
-            Route("/sse", endpoint=sse_handler, methods=["GET"]),
-            Route("/messages", endpoint=messages_handler, methods=["POST"]),
+            Route("/sse", endpoint=protect(sse_handler), methods=["GET"]),
+            Route("/messages", endpoint=protect(messages_handler), methods=["POST"]),
         ],
-        middleware=[
-            Middleware(APIKeyMiddleware)
-        ]
+        debug=debug,
+        static_responses={"/": root_body, "/health": health_body},
     )
     
     return app
 
 
+def _build_server_config(instance_url: str, username: str, password: str) -> ServerConfig:
+    """Build the (frozen) basic-auth server configuration for a ServiceNow instance."""
+    auth_config = AuthConfig(
+        type=AuthType.BASIC,
+        basic=BasicAuthConfig(username=username, password=password)
+    )
+    
+    return ServerConfig(
+        instance_url=instance_url,
+        auth=auth_config
+    )
+
+
 def create_servicenow_sse_server(instance_url: str, username: str, password: str):
     """
     Factory function to create ServiceNow MCP server with SSE transport.
@@ -381,17 +709,8 @@ def create_servicenow_sse_server(instance_url: str, username: str, password: str
     """
     logger.info(f"Creating ServiceNow MCP server for: {instance_url}")
     
-    # Create auth configuration
-    auth_config = AuthConfig(
-        type=AuthType.BASIC,
-        basic=BasicAuthConfig(username=username, password=password)
-    )
-    
     # Create server configuration
-    server_config = ServerConfig(
-        instance_url=instance_url,
-        auth=auth_config
-    )
+    server_config = _build_server_config(instance_url, username, password)
     
     # Create MCP server instance
     servicenow_mcp = ServiceNowMCP(server_config)
@@ -405,6 +724,83 @@ def create_servicenow_sse_server(instance_url: str, username: str, password: str
     return mcp_server, starlette_app
 
 
+def _load_env():
+    """
+    Read the required ServiceNow connection settings from the environment.
+    
+    Returns:
+        Tuple of (instance_url, username, password)
+        
+    Raises:
+        ValueError: If any of REQUIRED_ENV_VARS is missing or empty
+    """
+    env = os.environ
+    missing_vars = [name for name in REQUIRED_ENV_VARS if not env.get(name)]
+    
+    if missing_vars:
+        logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
+        logger.error("Please set these in your .env file or environment")
+        raise ValueError(f"Missing environment variables: {missing_vars}")
+    
+    return tuple(env[name] for name in REQUIRED_ENV_VARS)
+
+
+def build_app() -> Starlette:
+    """
+    Application factory used when running several uvicorn workers.
+    
+    Each worker process calls this to build its own ServiceNow MCP server
+    and Starlette app from the environment.
+    
+    Returns:
+        Configured Starlette application
+    """
+    load_dotenv()
+    instance_url, username, password = _load_env()
+    
+    _, starlette_app = create_servicenow_sse_server(
+        instance_url=instance_url,
+        username=username,
+        password=password
+    )
+    
+    return starlette_app
+
+
+def _serve_http2(app, args, access_log: bool):
+    """
+    Serve the app with Hypercorn, which speaks HTTP/2 as well as HTTP/1.1.
+    
+    Browsers only negotiate HTTP/2 over TLS, so ``--certfile``/``--keyfile``
+    are needed for SSE streams to share one connection; without them clients
+    must use HTTP/2 with prior knowledge (h2c).
+    """
+    try:
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+    except ImportError as e:
+        raise RuntimeError(
+            "--http2 requires hypercorn; install it with: pip install 'servicenow-mcp[http2]'"
+        ) from e
+    
+    config = Config()
+    config.bind = [f"{args.host}:{args.port}"]
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.certfile = args.certfile
+    config.keyfile = args.keyfile
+    config.backlog = args.backlog
+    config.keep_alive_timeout = 75
+    # Pass logger objects so Hypercorn doesn't attach its own stderr handlers;
+    # records then reach the root queue handler like the rest of the app's
+    config.errorlog = logging.getLogger("hypercorn.error")
+    config.accesslog = logging.getLogger("hypercorn.access") if access_log else None
+    
+    if not args.certfile:
+        logger.warning("--http2 without --certfile: browsers will fall back to HTTP/1.1")
+    
+    asyncio.run(serve(app, config))
+
+
 def main():
     """Main entry point for SSE server."""
     load_dotenv()
@@ -424,27 +820,63 @@ def main():
         default=8080,
         help="Port to listen on (default: 8080)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes (default: 1). SSE and stateless sessions "
+            "live in each worker's memory, so more than one worker requires a "
+            "load balancer with sticky sessions"
+        )
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=4096,
+        help=(
+            "Maximum number of pending connections on the listening socket "
+            "(default: 4096, capped by the kernel's somaxconn)"
+        )
+    )
+    parser.add_argument(
+        "--limit-concurrency",
+        type=int,
+        default=None,
+        help=(
+            "Maximum number of concurrent connections and tasks per worker before "
+            "uvicorn answers with 503 (default: unlimited). Open SSE streams count "
+            "towards the limit"
+        )
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help=(
+            "Serve with Hypercorn so clients can multiplex SSE streams over one "
+            "HTTP/2 connection (requires the 'http2' extra; single worker only)"
+        )
+    )
+    parser.add_argument(
+        "--certfile",
+        default=None,
+        help="TLS certificate file for --http2 (browsers only use HTTP/2 over TLS)"
+    )
+    parser.add_argument(
+        "--keyfile",
+        default=None,
+        help="TLS private key file for --http2"
+    )
     args = parser.parse_args()
     
-    # Get environment variables
-    instance_url = os.getenv("SERVICENOW_INSTANCE_URL")
-    username = os.getenv("SERVICENOW_USERNAME")
-    password = os.getenv("SERVICENOW_PASSWORD")
-    api_key = os.getenv("MCP_API_KEY")
-    
-    # Validate required environment variables
-    missing_vars = []
-    if not instance_url:
-        missing_vars.append("SERVICENOW_INSTANCE_URL")
-    if not username:
-        missing_vars.append("SERVICENOW_USERNAME")
-    if not password:
-        missing_vars.append("SERVICENOW_PASSWORD")
+    if args.http2 and args.workers > 1:
+        parser.error("--http2 runs a single worker; use a load balancer to scale out")
+    if bool(args.certfile) != bool(args.keyfile):
+        parser.error("--certfile and --keyfile must be given together")
     
-    if missing_vars:
-        logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
-        logger.error("Please set these in your .env file or environment")
-        raise ValueError(f"Missing environment variables: {missing_vars}")
+    # Get and validate environment variables
+    instance_url, username, password = _load_env()
+    api_key = os.getenv("MCP_API_KEY")
     
     # Warn if API key is not set
     if not api_key:
@@ -461,12 +893,6 @@ def main():
     
     # Create server and app
     try:
-        mcp_server, starlette_app = create_servicenow_sse_server(
-            instance_url=instance_url,
-            username=username,
-            password=password
-        )
-        
         logger.info(f"Starting server on {args.host}:{args.port}")
         logger.info("="*70)
         logger.info("SUPPORTED MODES:")
@@ -475,22 +901,51 @@ def main():
         logger.info("="*70)
         
         # Configure uvicorn with SSE-friendly settings
-        config = uvicorn.Config(
-            starlette_app,
+        uvicorn_options = dict(
             host=args.host,
             port=args.port,
             log_level="info",
-            access_log=True,
-            timeout_keep_alive=0,  # Disable timeout for SSE
+            access_log=os.getenv("MCP_ACCESS_LOG", "0") == "1",
+            # Only idle connections time out; open SSE streams are unaffected,
+            # and POST /messages clients can reuse their connection
+            timeout_keep_alive=75,
+            loop=UVICORN_LOOP,
+            http=UVICORN_HTTP,
+            ws="none",  # No websocket endpoints
+            backlog=args.backlog,
+            limit_concurrency=args.limit_concurrency,
         )
         
-        server = uvicorn.Server(config)
-        
         logger.info(f"SSE endpoint available at: http://{args.host}:{args.port}/sse")
         logger.info(f"Messages endpoint: http://{args.host}:{args.port}/messages")
         logger.info(f"Health check available at: http://{args.host}:{args.port}/health")
         
-        server.run()
+        if args.http2:
+            _, starlette_app = create_servicenow_sse_server(
+                instance_url=instance_url,
+                username=username,
+                password=password
+            )
+            
+            _serve_http2(starlette_app, args, uvicorn_options["access_log"])
+        elif args.workers > 1:
+            # Each worker process builds its own server through the factory
+            logger.info(f"Running {args.workers} worker processes")
+            uvicorn.run(
+                "servicenow_mcp.server_sse:build_app",
+                factory=True,
+                workers=args.workers,
+                **uvicorn_options,
+            )
+        else:
+            mcp_server, starlette_app = create_servicenow_sse_server(
+                instance_url=instance_url,
+                username=username,
+                password=password
+            )
+            
+            server = uvicorn.Server(uvicorn.Config(starlette_app, **uvicorn_options))
+            server.run()
         
     except Exception as e:
         logger.error(f"Failed to start server: {e}", exc_info=True)
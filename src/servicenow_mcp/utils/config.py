@@ -5,7 +5,7 @@ Configuration module for the ServiceNow MCP server.
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AuthType(str, Enum):
@@ -19,6 +19,8 @@ class AuthType(str, Enum):
 class BasicAuthConfig(BaseModel):
     """Configuration for basic authentication."""
 
+    model_config = ConfigDict(frozen=True)
+
     username: str
     password: str
 
@@ -26,6 +28,8 @@ class BasicAuthConfig(BaseModel):
 class OAuthConfig(BaseModel):
     """Configuration for OAuth authentication."""
 
+    model_config = ConfigDict(frozen=True)
+
     client_id: str
     client_secret: str
     username: str
@@ -36,6 +40,8 @@ class OAuthConfig(BaseModel):
 class ApiKeyConfig(BaseModel):
     """Configuration for API key authentication."""
 
+    model_config = ConfigDict(frozen=True)
+
     api_key: str
     header_name: str = "X-ServiceNow-API-Key"
 
@@ -43,6 +49,8 @@ class ApiKeyConfig(BaseModel):
 class AuthConfig(BaseModel):
     """Authentication configuration."""
 
+    model_config = ConfigDict(frozen=True)
+
     type: AuthType
     basic: Optional[BasicAuthConfig] = None
     oauth: Optional[OAuthConfig] = None
@@ -52,6 +60,8 @@ class AuthConfig(BaseModel):
 class ServerConfig(BaseModel):
     """Server configuration."""
 
+    model_config = ConfigDict(frozen=True)
+
     instance_url: str
     auth: AuthConfig
     debug: bool = False
@@ -0,0 +1,34 @@
+"""
+Tests for the authentication manager.
+"""
+
+import base64
+
+import pytest
+
+from servicenow_mcp.auth.auth_manager import AuthManager
+from servicenow_mcp.utils.config import AuthConfig, AuthType, BasicAuthConfig
+
+
+def test_basic_auth_headers():
+    """Test that basic auth produces an encoded Authorization header."""
+    auth_manager = AuthManager(
+        AuthConfig(type=AuthType.BASIC, basic=BasicAuthConfig(username="user", password="pass"))
+    )
+
+    headers = auth_manager.get_headers()
+    expected = base64.b64encode(b"user:pass").decode()
+    assert headers["Authorization"] == f"Basic {expected}"
+    assert headers["Accept"] == "application/json"
+
+    # Callers may modify the returned headers without affecting later calls
+    headers["Authorization"] = "changed"
+    assert auth_manager.get_headers()["Authorization"] == f"Basic {expected}"
+
+
+def test_basic_auth_requires_credentials():
+    """Test that basic auth without credentials is rejected."""
+    auth_manager = AuthManager(AuthConfig(type=AuthType.BASIC))
+
+    with pytest.raises(ValueError):
+        auth_manager.get_headers()
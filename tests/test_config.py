@@ -2,6 +2,9 @@
 Tests for the configuration module.
 """
 
+import pytest
+from pydantic import ValidationError
+
 from servicenow_mcp.utils.config import (
     ApiKeyConfig,
     AuthConfig,
@@ -127,4 +130,18 @@ def test_server_config():
         timeout=60,
     )
     assert config.debug is True
-    assert config.timeout == 60 
\ No newline at end of file
+    assert config.timeout == 60 
+
+
+def test_configs_are_frozen():
+    """Test that configuration objects cannot be modified after validation."""
+    auth_config = AuthConfig(
+        type=AuthType.BASIC,
+        basic=BasicAuthConfig(username="user", password="pass"),
+    )
+    config = ServerConfig(instance_url="https://example.service-now.com", auth=auth_config)
+
+    with pytest.raises(ValidationError):
+        config.instance_url = "https://other.service-now.com"
+    with pytest.raises(ValidationError):
+        config.auth.basic.password = "other"
@@ -0,0 +1,46 @@
+"""
+Tests for the ServiceNow MCP server tool dispatch.
+"""
+
+import asyncio
+import threading
+
+from pydantic import BaseModel
+
+from servicenow_mcp.server import ServiceNowMCP
+from servicenow_mcp.utils.config import AuthConfig, AuthType, BasicAuthConfig, ServerConfig
+
+
+class EchoParams(BaseModel):
+    """Parameters for the test tool."""
+
+    value: str
+
+
+def test_call_tool_runs_implementation_off_the_event_loop():
+    """Test that blocking tool implementations run in a worker thread."""
+    server = ServiceNowMCP(
+        ServerConfig(
+            instance_url="https://test.service-now.com",
+            auth=AuthConfig(
+                type=AuthType.BASIC,
+                basic=BasicAuthConfig(username="test_user", password="test_password"),
+            ),
+        )
+    )
+    calls = []
+
+    def echo(config, auth_manager, params):
+        calls.append(threading.get_ident())
+        return {"value": params.value}
+
+    server.tool_definitions["echo"] = (echo, EchoParams, dict, "Echo", "json")
+    server.enabled_tool_names.append("echo")
+
+    async def call():
+        return threading.get_ident(), await server._call_tool_impl("echo", {"value": "hi"})
+
+    loop_thread, result = asyncio.run(call())
+
+    assert calls and calls[0] != loop_thread
+    assert '"value": "hi"' in result[0].text
@@ -0,0 +1,409 @@
+"""
+Tests for the ServiceNow MCP SSE server application.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import mcp.types as types
+import pytest
+from starlette.testclient import TestClient
+
+from servicenow_mcp.server_sse import (
+    SSE_RESPONSE_HEADERS,
+    _load_env,
+    _read_body,
+    _with_sse_headers,
+    create_sse_server_app,
+    stateless_sessions,
+)
+
+API_KEY = "test-api-key"
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {"protocolVersion": "2024-11-05", "capabilities": {}},
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Create a test client for an app protected by MCP_API_KEY."""
+    monkeypatch.setenv("MCP_API_KEY", API_KEY)
+    stateless_sessions.clear()
+    app = create_sse_server_app(MagicMock(), MagicMock())
+    with TestClient(app) as test_client:
+        yield test_client
+    stateless_sessions.clear()
+
+
+def test_health_does_not_require_api_key(client):
+    """Test that the health check is reachable without an API key."""
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+    assert response.json()["authentication"] == "enabled"
+
+
+def test_root_reports_service_info(client):
+    """Test that the root endpoint serves the precomputed service description."""
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["authentication"] == "API Key required"
+
+
+def test_probe_routes_still_handle_other_methods(client):
+    """Test that only GET probes are short-circuited ahead of the router."""
+    response = client.head("/health")
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(client.get("/health").content))
+
+    response = client.post("/health")
+    assert response.status_code == 405
+
+
+def test_messages_rejects_missing_api_key(client):
+    """Test that protected endpoints reject requests without an API key."""
+    response = client.post("/messages", json=INITIALIZE_REQUEST)
+    assert response.status_code == 401
+    assert response.json()["error"] == "Unauthorized"
+
+
+def test_messages_rejects_invalid_api_key(client):
+    """Test that protected endpoints reject a wrong API key."""
+    response = client.post("/messages", json=INITIALIZE_REQUEST, headers={"X-API-Key": "wrong"})
+    assert response.status_code == 401
+
+
+def test_messages_accepts_x_api_key_header(client):
+    """Test that the X-API-Key header authenticates a stateless request."""
+    response = client.post("/messages", json=INITIALIZE_REQUEST, headers={"X-API-Key": API_KEY})
+    assert response.status_code == 200
+    assert response.json()["result"]["protocolVersion"] == "2024-11-05"
+
+
+def test_messages_accepts_bearer_token(client):
+    """Test that a Bearer Authorization header authenticates a stateless request."""
+    response = client.post(
+        "/messages", json=INITIALIZE_REQUEST, headers={"Authorization": f"Bearer {API_KEY}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == 1
+
+
+def test_x_api_key_takes_precedence_over_authorization(client):
+    """Test that a valid X-API-Key wins over an unrelated Authorization header."""
+    response = client.post(
+        "/messages",
+        json=INITIALIZE_REQUEST,
+        headers={"X-API-Key": API_KEY, "Authorization": "Bearer something-else"},
+    )
+    assert response.status_code == 200
+
+
+def test_wrong_method_is_not_allowed(client):
+    """Test that a known path with the wrong method still returns 405."""
+    response = client.get("/messages", headers={"X-API-Key": API_KEY})
+    assert response.status_code == 405
+
+
+def test_unknown_path_is_not_found(client):
+    """Test that paths outside the route table fall through to a 404."""
+    response = client.get("/missing", headers={"X-API-Key": API_KEY})
+    assert response.status_code == 404
+
+
+def test_middleware_skipped_without_configured_api_key(monkeypatch):
+    """Test that requests reach the handlers directly when MCP_API_KEY is not set."""
+    monkeypatch.delenv("MCP_API_KEY", raising=False)
+    stateless_sessions.clear()
+    app = create_sse_server_app(MagicMock(), MagicMock())
+    with TestClient(app) as test_client:
+        assert test_client.get("/health").json()["authentication"] == "disabled"
+        response = test_client.post("/messages", json=INITIALIZE_REQUEST)
+    stateless_sessions.clear()
+    # The JSON-RPC error comes from the stateless handler, not the middleware,
+    # which still needs a key to derive its session from
+    assert response.status_code == 401
+    assert response.json()["error"]["code"] == -32001
+
+
+def test_sse_headers_override_transport_defaults():
+    """Test that SSE responses carry the proxy-friendly headers exactly once."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    start = {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-store")],
+    }
+    body = {"type": "http.response.body", "body": b": ping\r\n\r\n"}
+
+    wrapped = _with_sse_headers(send)
+    asyncio.run(wrapped(start))
+    asyncio.run(wrapped(body))
+
+    headers = sent[0]["headers"]
+    assert (b"content-type", b"text/event-stream") in headers
+    assert [value for name, value in headers if name == b"cache-control"] == [
+        b"no-cache, no-transform"
+    ]
+    for header in SSE_RESPONSE_HEADERS:
+        assert header in headers
+    assert sent[1] is body
+
+
+def test_sse_mode_message_for_unknown_session(client):
+    """Test that SSE-mode posts are answered by the transport for unknown sessions."""
+    response = client.post(
+        "/messages?session_id=0123456789abcdef0123456789abcdef",
+        json=INITIALIZE_REQUEST,
+        headers={"X-API-Key": API_KEY},
+    )
+    assert response.status_code == 404
+    assert response.text == "Could not find session"
+
+
+def test_load_env_reports_all_missing_variables(monkeypatch):
+    """Test that every missing ServiceNow setting is reported at once."""
+    monkeypatch.setenv("SERVICENOW_INSTANCE_URL", "https://example.service-now.com")
+    monkeypatch.delenv("SERVICENOW_USERNAME", raising=False)
+    monkeypatch.setenv("SERVICENOW_PASSWORD", "")
+
+    with pytest.raises(ValueError) as excinfo:
+        _load_env()
+    assert "SERVICENOW_USERNAME" in str(excinfo.value)
+    assert "SERVICENOW_PASSWORD" in str(excinfo.value)
+
+
+def test_load_env_returns_settings_in_order(monkeypatch):
+    """Test that the settings come back as (instance_url, username, password)."""
+    monkeypatch.setenv("SERVICENOW_INSTANCE_URL", "https://example.service-now.com")
+    monkeypatch.setenv("SERVICENOW_USERNAME", "user")
+    monkeypatch.setenv("SERVICENOW_PASSWORD", "pass")
+
+    assert _load_env() == ("https://example.service-now.com", "user", "pass")
+
+
+def test_stateless_parse_error(client):
+    """Test that malformed JSON bodies produce a JSON-RPC parse error."""
+    response = client.post(
+        "/messages",
+        content=b"{not json",
+        headers={"X-API-Key": API_KEY, "Content-Type": "application/json"},
+    )
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == -32700
+    assert response.json()["id"] is None
+
+
+def test_stateless_errors_keep_request_id(client):
+    """Test that JSON-RPC errors echo the request id."""
+    headers = {"X-API-Key": API_KEY}
+    response = client.post(
+        "/messages", json={"jsonrpc": "2.0", "id": 7, "method": "tools/list"}, headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "jsonrpc": "2.0",
+        "error": {"code": -32002, "message": "Session not initialized"},
+        "id": 7,
+    }
+
+    response = client.post(
+        "/messages", json={"jsonrpc": "2.0", "id": "abc", "method": "bogus"}, headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json()["error"] == {"code": -32601, "message": "Method not found: bogus"}
+    assert response.json()["id"] == "abc"
+
+
+def test_stateless_rejects_ids_that_cannot_be_echoed(client):
+    """Test that ids which are not strings, integers or null are invalid requests."""
+    headers = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
+    for request_id in (b"18446744073709551616", b"1.5", b"true"):
+        response = client.post(
+            "/messages",
+            content=b'{"jsonrpc":"2.0","id":' + request_id + b',"method":"initialize"}',
+            headers=headers,
+        )
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == -32600
+        assert response.json()["id"] is None
+
+
+def test_stateless_batch_request(client):
+    """Test that a JSON-RPC batch returns one response per request, in order."""
+    batch = [
+        INITIALIZE_REQUEST,
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": 2, "method": "bogus"},
+        42,
+    ]
+    response = client.post("/messages", json=batch, headers={"X-API-Key": API_KEY})
+    assert response.status_code == 200
+
+    results = response.json()
+    assert [result["id"] for result in results] == [1, 2, None]
+    assert results[0]["result"]["serverInfo"]["name"] == "ServiceNow MCP Server"
+    assert results[1]["error"]["code"] == -32601
+    assert results[2]["error"]["code"] == -32600
+
+
+def test_stateless_batch_of_notifications_has_no_content(client):
+    """Test that a batch of only notifications gets an empty response."""
+    batch = [
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "method": "notifications/cancelled"},
+    ]
+    response = client.post("/messages", json=batch, headers={"X-API-Key": API_KEY})
+    assert response.status_code == 202
+    assert response.content == b""
+
+
+def test_stateless_notifications_get_no_response_body(client):
+    """Test that notifications, known or not, are accepted without a body."""
+    headers = {"X-API-Key": API_KEY}
+    for method in ("notifications/initialized", "notifications/unknown"):
+        notification = {"jsonrpc": "2.0", "method": method}
+        response = client.post("/messages", json=notification, headers=headers)
+        assert response.status_code == 202
+        assert response.content == b""
+
+
+def test_stateless_message_without_method_is_invalid(client):
+    """Test that a message without a method is rejected, alone or in a batch."""
+    headers = {"X-API-Key": API_KEY}
+    response = client.post("/messages", json={}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == -32600
+    assert response.json()["id"] is None
+
+    response = client.post("/messages", json=[{}, {"jsonrpc": "2.0"}], headers=headers)
+    assert response.status_code == 200
+    assert [result["error"]["code"] for result in response.json()] == [-32600, -32600]
+
+
+def test_stateless_failing_notification_gets_no_error(client):
+    """Test that a notification whose handler fails is still answered with an empty 202."""
+    headers = {"X-API-Key": API_KEY}
+    notification = {"jsonrpc": "2.0", "method": "initialize", "params": None}
+    response = client.post("/messages", json=notification, headers=headers)
+    assert response.status_code == 202
+    assert response.content == b""
+
+    response = client.post("/messages", json=[notification, INITIALIZE_REQUEST], headers=headers)
+    assert response.status_code == 200
+    assert [result["id"] for result in response.json()] == [1]
+
+
+def test_stateless_batch_limits(client):
+    """Test that empty and oversized batches are rejected as invalid requests."""
+    headers = {"X-API-Key": API_KEY}
+    response = client.post("/messages", json=[], headers=headers)
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == -32600
+
+    response = client.post("/messages", json=[INITIALIZE_REQUEST] * 101, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == -32600
+
+
+def test_stateless_tools_list_is_cached(monkeypatch):
+    """Test that tools/list serializes the tool catalog once and reuses it."""
+    monkeypatch.setenv("MCP_API_KEY", API_KEY)
+    stateless_sessions.clear()
+    servicenow_mcp = MagicMock()
+    servicenow_mcp._list_tools_impl = AsyncMock(
+        return_value=[
+            types.Tool(
+                name="list_incidents",
+                description="List incidents",
+                inputSchema={"type": "object", "properties": {}},
+            )
+        ]
+    )
+    app = create_sse_server_app(MagicMock(), servicenow_mcp)
+    headers = {"X-API-Key": API_KEY}
+
+    with TestClient(app) as test_client:
+        test_client.post("/messages", json=INITIALIZE_REQUEST, headers=headers)
+        for request_id in (2, 3):
+            response = test_client.post(
+                "/messages",
+                json={"jsonrpc": "2.0", "id": request_id, "method": "tools/list"},
+                headers=headers,
+            )
+            assert response.status_code == 200
+            assert response.json() == {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "result": {
+                    "tools": [
+                        {
+                            "name": "list_incidents",
+                            "description": "List incidents",
+                            "inputSchema": {"type": "object", "properties": {}},
+                        }
+                    ]
+                },
+            }
+    stateless_sessions.clear()
+
+    servicenow_mcp._list_tools_impl.assert_awaited_once()
+
+
+def test_read_body_joins_chunks():
+    """Test that multi-chunk request bodies are read completely."""
+    messages = iter(
+        [
+            {"type": "http.request", "body": b'{"a":', "more_body": True},
+            {"type": "http.request", "body": b"", "more_body": True},
+            {"type": "http.request", "body": b"1}", "more_body": False},
+        ]
+    )
+
+    async def receive():
+        return next(messages)
+
+    assert bytes(asyncio.run(_read_body(receive))) == b'{"a":1}'
+
+
+def test_stateless_tools_call(monkeypatch):
+    """Test that tools/call wraps the tool's text output in a JSON-RPC result."""
+    monkeypatch.setenv("MCP_API_KEY", API_KEY)
+    stateless_sessions.clear()
+    servicenow_mcp = MagicMock()
+    servicenow_mcp._call_tool_impl = AsyncMock(
+        return_value=[types.TextContent(type="text", text='{"ok": true}')]
+    )
+    app = create_sse_server_app(MagicMock(), servicenow_mcp)
+    headers = {"X-API-Key": API_KEY}
+
+    with TestClient(app) as test_client:
+        test_client.post("/messages", json=INITIALIZE_REQUEST, headers=headers)
+        response = test_client.post(
+            "/messages",
+            json={
+                "jsonrpc": "2.0",
+                "id": 5,
+                "method": "tools/call",
+                "params": {"name": "get_incident", "arguments": {"number": "INC1"}},
+            },
+            headers=headers,
+        )
+    stateless_sessions.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "jsonrpc": "2.0",
+        "id": 5,
+        "result": {"content": [{"type": "text", "text": '{"ok": true}'}]},
+    }
+    servicenow_mcp._call_tool_impl.assert_awaited_once_with("get_incident", {"number": "INC1"})